@@ -17,154 +17,303 @@ Examples:
 from __future__ import annotations
 
 import argparse
+import atexit
+import contextlib
+import functools
+import marshal
+import os
 import re
 import sys
+from array import array
+from bisect import bisect_left
+from collections.abc import Iterable, Iterator, Sequence
 from dataclasses import dataclass
 from pathlib import Path
-
+from types import ModuleType
+
+from meep_docs_core import (
+    CodeBlock,
+    Heading,
+    ParsedDoc,
+    build_parsed_doc,
+    count_lines,
+    heading_path_for_line,
+    heading_paths,
+    normalize_heading,
+    parse_markdown,
+    scan_markdown,
+    section_bounds,
+)
 
 DEFAULT_DOC_ROOT = Path(__file__).resolve().parents[1] / "doc" / "docs"
-HEADING_RE = re.compile(r"^(#{1,6})\s*(.*?)\s*#*\s*$")
-SETEXT_RE = re.compile(r"^(=+|-+)\s*$")
-FENCE_RE = re.compile(r"^\s*(`{3,}|~{3,})\s*([A-Za-z0-9_+.\-]*)?.*$")
+DEFAULT_CACHE_DIR = (
+    Path(os.environ.get("XDG_CACHE_HOME") or Path("~/.cache").expanduser()) / "meep_docs"
+)
+CACHE_VERSION = 6
+PARALLEL_MIN_PAGES = 256
+# Regex constructs that can stop matching a line once the neighbouring lines are
+# visible, so whole-page scans cannot be used to find candidate lines: negative
+# lookarounds, \A/\Z, and atomic groups or possessive quantifiers, which never give
+# back text they consumed past the end of the line.
+LINE_BOUND_RE = re.compile(r"\(\?<?!|\\[AZ]|\(\?>|[*+?}]\+")
+# Escapes and class syntax that Hyperscan reads differently from Python's re
+# (Unicode tables for \w/\d, "{,n}" quantifiers, POSIX bracket classes).
+HYPERSCAN_UNSAFE_RE = re.compile(r"\\[A-Za-z0-9]|\{,|\[[:.=]")
+# Inline flag groups that switch on IGNORECASE, globally "(?i)" or scoped "(?i:...)".
+INLINE_IGNORECASE_RE = re.compile(r"\(\?[aiLmsux]*i[aiLmsux]*[-:)]")
+ESCAPE_HEX_DIGITS = {"x": 2, "u": 4, "U": 8}
+# "{" only starts a repeat when it reads as one; anything else is a literal brace.
+REPEAT_RE = re.compile(r"\{[0-9]*(?:,[0-9]*)?\}")
+# Line boundaries str.splitlines() honours besides "\n" and "\r".
+EXTRA_LINE_BREAKS = ("\x0b", "\x0c", "\x1c", "\x1d", "\x1e", "\x85", "\u2028", "\u2029")
+LANG_ALIASES = {"py": "python", "python3": "python", "bash": "shell", "sh": "shell", "zsh": "shell"}
+PYTHON_LANGS = frozenset({"python", "py", "python3"})
+SHELL_LANGS = frozenset({"shell", "bash", "sh", "zsh"})
 STDOUT_ENCODING = sys.stdout.encoding or "utf-8"
 STDERR_ENCODING = sys.stderr.encoding or "utf-8"
 
 
-@dataclass
-class Heading:
-    line_index: int
-    level: int
-    text: str
-    span_lines: int
+cache_dir: Path | None = DEFAULT_CACHE_DIR
+_text_cache: dict[Path, tuple[tuple[int, int], str]] = {}
+_parse_cache: dict[Path, tuple[tuple, ParsedDoc]] = {}
 
 
-@dataclass
-class CodeBlock:
-    start_line_index: int
-    end_line_index: int
-    lang: str
-    closed: bool
+def die(msg: str) -> "None":
+    sys.stderr.buffer.write(f"error: {msg}\n".encode(STDERR_ENCODING, errors="replace"))
+    raise SystemExit(1)
 
 
-@dataclass
-class ParsedDoc:
-    headings: list[Heading]
-    code_blocks: list[CodeBlock]
+class OutputBuffer:
+    # Collects encoded output and hands it to stdout in large chunks instead of one
+    # write call per line.
+    __slots__ = ("buf", "limit")
 
+    def __init__(self, limit: int = 1 << 16) -> None:
+        self.buf = bytearray()
+        self.limit = limit
+
+    def write(self, data: bytes) -> None:
+        self.buf += data
+        if len(self.buf) >= self.limit:
+            self.flush()
+
+    def flush(self) -> None:
+        if self.buf:
+            try:
+                sys.stdout.buffer.write(self.buf)
+            finally:
+                self.buf.clear()
 
-def die(msg: str) -> "None":
-    sys.stderr.buffer.write(f"error: {msg}\n".encode(STDERR_ENCODING, errors="replace"))
-    raise SystemExit(1)
+
+_out = OutputBuffer()
+atexit.register(_out.flush)
 
 
 def write_out(text: str) -> None:
-    sys.stdout.buffer.write(f"{text}\n".encode(STDOUT_ENCODING, errors="replace"))
+    _out.write(f"{text}\n".encode(STDOUT_ENCODING, errors="replace"))
 
 
-def iter_pages(root: Path) -> list[Path]:
-    return sorted(
-        root.rglob("*.md"),
-        key=lambda p: p.relative_to(root).as_posix().lower(),
-    )
+def write_lines(lines: Iterable[str]) -> None:
+    _out.write("".join(f"{line}\n" for line in lines).encode(STDOUT_ENCODING, errors="replace"))
 
 
-def relpath(path: Path, root: Path) -> str:
-    return path.relative_to(root).as_posix()
+def write_text(text: str) -> None:
+    _out.write(text.encode(STDOUT_ENCODING, errors="replace"))
 
 
-def normalize_heading(text: str) -> str:
-    text = text.strip()
-    text = re.sub(r"^#+\s*", "", text)
-    text = re.sub(r"\s*#+\s*$", "", text)
-    return re.sub(r"\s+", " ", text).strip()
+@functools.lru_cache(maxsize=None)
+def iter_pages(root: Path) -> tuple[Path, ...]:
+    base = os.fspath(root)
+    prefix = len(os.path.join(base, ""))
+    found: list[tuple[str, str]] = []
+    stack = [base]
+    while stack:
+        try:
+            entries = os.scandir(stack.pop())
+        except PermissionError:
+            # Skip unreadable directories, as Path.rglob does.
+            continue
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.name.endswith(".md"):
+                    found.append((entry.path[prefix:].replace(os.sep, "/").lower(), entry.path))
+    found.sort()
+    return tuple(Path(path) for _, path in found)
 
 
-def read_lines(path: Path) -> list[str]:
-    return path.read_text(encoding="utf-8", errors="replace").splitlines()
+def init_worker(worker_cache_dir: Path | None) -> None:
+    global cache_dir
+    cache_dir = worker_cache_dir
 
 
-def parse_markdown(lines: list[str]) -> ParsedDoc:
-    headings: list[Heading] = []
-    code_blocks: list[CodeBlock] = []
+def page_workers(count: int) -> int:
+    # Pages are independent, so large trees are fanned out over worker processes;
+    # for small trees the pool start-up costs more than it saves.
+    workers = os.cpu_count() or 1
+    return workers if count >= PARALLEL_MIN_PAGES else 1
 
-    in_code = False
-    fence_char = ""
-    fence_len = 0
-    fence_start = -1
-    fence_lang = ""
-    i = 0
-    while i < len(lines):
-        line = lines[i]
-
-        if in_code:
-            stripped = line.lstrip()
-            if stripped.startswith(fence_char * fence_len):
-                code_blocks.append(
-                    CodeBlock(
-                        start_line_index=fence_start,
-                        end_line_index=i + 1,
-                        lang=fence_lang,
-                        closed=True,
-                    )
-                )
-                in_code = False
-            i += 1
-            continue
 
-        m_fence = FENCE_RE.match(line)
-        if m_fence:
-            marker = m_fence.group(1)
-            fence_char = marker[0]
-            fence_len = len(marker)
-            fence_start = i
-            fence_lang = (m_fence.group(2) or "").strip().lower()
-            in_code = True
-            i += 1
-            continue
+@functools.lru_cache(maxsize=None)
+def load_hyperscan() -> ModuleType | None:
+    # Optional, and slow to import; only search needs it.
+    try:
+        import hyperscan
+    except ImportError:
+        return None
+    return hyperscan
 
-        m = HEADING_RE.match(line)
-        if m:
-            level = len(m.group(1))
-            text = normalize_heading(m.group(2))
-            if text:
-                headings.append(Heading(i, level, text, 1))
-            i += 1
-            continue
 
-        if i + 1 < len(lines):
-            nxt = lines[i + 1]
-            m2 = SETEXT_RE.match(nxt)
-            if m2 and line.strip():
-                level = 1 if nxt.strip().startswith("=") else 2
-                text = normalize_heading(line)
-                if text:
-                    headings.append(Heading(i, level, text, 2))
-                i += 2
-                continue
+def relpath(path: Path, root: Path) -> str:
+    return path.relative_to(root).as_posix()
 
-        i += 1
 
-    if in_code:
-        code_blocks.append(
-            CodeBlock(
-                start_line_index=fence_start,
-                end_line_index=len(lines),
-                lang=fence_lang,
-                closed=False,
-            )
-        )
+def stat_key(path: Path) -> tuple[int, int]:
+    st = path.stat()
+    return st.st_mtime_ns, st.st_size
+
 
-    return ParsedDoc(headings=headings, code_blocks=code_blocks)
+def read_file(path: Path) -> tuple[tuple[int, int], str]:
+    # One open, one fstat (which doubles as the cache key) and a read sized from it,
+    # then on to EOF: a read may come up short (very large files, network or FUSE
+    # mounts) and the file may have grown since. Decoding matches Path.read_text,
+    # including its universal-newline translation; the other splitlines() boundaries
+    # become "\n" too, so pages keep the line numbers they had when they were read
+    # with read_text().splitlines().
+    # O_BINARY keeps the Windows C runtime from translating CRLF or stopping at ^Z.
+    fd = os.open(path, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+    try:
+        st = os.fstat(fd)
+        chunks = [os.read(fd, st.st_size + 1)]
+        while chunks[-1]:
+            chunks.append(os.read(fd, 1 << 16))
+        data = chunks[0] if len(chunks) == 2 else b"".join(chunks)
+    finally:
+        os.close(fd)
+    text = data.decode("utf-8", errors="replace")
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    for sep in EXTRA_LINE_BREAKS:
+        if sep in text:
+            text = text.replace(sep, "\n")
+    return (st.st_mtime_ns, st.st_size), text
+
+
+def read_text(path: Path) -> str:
+    cached = _text_cache.get(path)
+    if cached is not None and cached[0] == stat_key(path):
+        return cached[1]
+    key, text = read_file(path)
+    _text_cache[path] = (key, text)
+    return text
+
+
+def read_doc(path: Path) -> tuple[str, array]:
+    # The page text plus the offset at which each line starts. Line i is
+    # text[starts[i] : starts[i + 1] - 1] and the page has len(starts) - 1 lines; an
+    # unterminated last line gets a sentinel one past the end of the text.
+    text = read_text(path)
+    starts = array("i", [0])
+    append = starts.append
+    find = text.find
+    i = find("\n")
+    while i >= 0:
+        append(i + 1)
+        i = find("\n", i + 1)
+    if text and not text.endswith("\n"):
+        append(len(text) + 1)
+    return text, starts
+
+
+def doc_span(text: str, starts: array, start: int, end: int) -> str:
+    # Lines [start, end) as one newline-terminated string, without splitting the page.
+    end = min(end, len(starts) - 1)
+    if start >= end:
+        return ""
+    span = text[starts[start] : starts[end]]
+    return span if span.endswith("\n") else f"{span}\n"
 
 
 def build_headings(lines: list[str]) -> list[Heading]:
-    return parse_markdown(lines).headings
+    return parse_markdown("\n".join(lines)).headings
+
+
+def cache_path(path: Path) -> Path | None:
+    if cache_dir is None:
+        return None
+    import zlib
+
+    digest = zlib.crc32(os.path.abspath(path).encode("utf-8", errors="replace"))
+    return cache_dir / f"{digest:08x}.marshal"
+
+
+def load_cached_scan(path: Path, key: tuple) -> tuple | None:
+    target = cache_path(path)
+    if target is None:
+        return None
+    try:
+        with target.open("rb") as f:
+            stored_key, scanned = marshal.load(f)
+    except Exception:
+        return None
+    if stored_key != key:
+        return None
+    return scanned
+
+
+def store_cached_scan(path: Path, key: tuple, scanned: tuple) -> None:
+    target = cache_path(path)
+    if target is None:
+        return
+    tmp = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+    try:
+        target.parent.mkdir(parents=True, exist_ok=True)
+        with tmp.open("wb") as f:
+            marshal.dump((key, scanned), f)
+        os.replace(tmp, target)
+    except OSError:
+        with contextlib.suppress(OSError):
+            tmp.unlink(missing_ok=True)
+
+
+def get_parsed(path: Path) -> ParsedDoc:
+    mtime_ns, size = stat_key(path)
+    key = (CACHE_VERSION, os.path.abspath(path), mtime_ns, size)
+    cached = _parse_cache.get(path)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+
+    # The disk cache holds the plain scan tuples rather than ParsedDoc: marshal is
+    # built in and loads them faster than the page can be re-scanned.
+    scanned = load_cached_scan(path, key)
+    if scanned is None:
+        text = read_text(path)
+        scanned = (*scan_markdown(text), count_lines(text))
+        store_cached_scan(path, key, scanned)
+    parsed = build_parsed_doc(*scanned)
+    _parse_cache[path] = (key, parsed)
+    return parsed
+
+
+@functools.lru_cache(maxsize=None)
+def page_index(
+    root: Path,
+) -> tuple[dict[str, list[Path]], dict[str, list[Path]], dict[str, list[Path]]]:
+    # Lowercased relative path, file name, and stem -> pages, built once per root.
+    by_rel: dict[str, list[Path]] = {}
+    by_name: dict[str, list[Path]] = {}
+    by_stem: dict[str, list[Path]] = {}
+    for p in iter_pages(root):
+        by_rel.setdefault(relpath(p, root).lower(), []).append(p)
+        by_name.setdefault(p.name.lower(), []).append(p)
+        by_stem.setdefault(p.stem.lower(), []).append(p)
+    return by_rel, by_name, by_stem
 
 
 def resolve_page(root: Path, page: str) -> Path:
     direct = (root / page).resolve()
-    if direct.exists() and direct.is_file():
+    if direct.is_file():
         return direct
 
     page_obj = Path(page)
@@ -172,24 +321,24 @@ def resolve_page(root: Path, page: str) -> Path:
     page_stem = page_obj.stem
     page_name_md = page_name if page_name.lower().endswith(".md") else f"{page_name}.md"
 
-    candidates: list[Path] = []
-    for p in iter_pages(root):
-        rel = relpath(p, root).lower()
-        if rel == page.lower() or rel == page_name_md.lower():
-            candidates.append(p)
-            continue
-        if p.name.lower() == page_name.lower() or p.name.lower() == page_name_md.lower():
-            candidates.append(p)
-            continue
-        if p.stem.lower() == page_stem.lower():
-            candidates.append(p)
-
-    unique = sorted(set(candidates))
-    if len(unique) == 1:
-        return unique[0]
-    if not unique:
+    by_rel, by_name, by_stem = page_index(root)
+    # Ordered de-duplication: a page usually turns up under several keys.
+    candidates: dict[Path, None] = {}
+    for index, key in (
+        (by_rel, page.lower()),
+        (by_rel, page_name_md.lower()),
+        (by_name, page_name.lower()),
+        (by_name, page_name_md.lower()),
+        (by_stem, page_stem.lower()),
+    ):
+        candidates.update(dict.fromkeys(index.get(key, ())))
+
+    if len(candidates) == 1:
+        return next(iter(candidates))
+    if not candidates:
         die(f"page not found: {page}")
 
+    unique = sorted(candidates)
     opts = ", ".join(relpath(p, root) for p in unique[:8])
     tail = " ..." if len(unique) > 8 else ""
     die(f"ambiguous page '{page}'. Use full relative path. Matches: {opts}{tail}")
@@ -204,30 +353,294 @@ def command_list(root: Path, limit: int) -> int:
     return 0
 
 
-def command_search(root: Path, pattern: str, case_sensitive: bool, max_results: int) -> int:
+def search_text(
+    text: str,
+    rx: re.Pattern[str],
+    scan: re.Pattern[str] | None,
+) -> Iterator[tuple[int, str]]:
+    if scan is None:
+        # Split on "\n" only, as the page scan and the parser count lines; drop the
+        # empty piece after a trailing newline.
+        lines = text.split("\n")
+        if not lines[-1]:
+            lines.pop()
+        for i, line in enumerate(lines, start=1):
+            if rx.search(line):
+                yield i, line
+        return
+
+    # Scan the whole page once and only cut out the lines the scan lands on; each
+    # candidate is re-checked with the per-line regex, since a page-wide match may
+    # run across a line break.
+    size = len(text)
+    line_no = 1
+    pos = 0
+    search_from = 0
+    while search_from < size:
+        m = scan.search(text, search_from)
+        if m is None:
+            break
+        start = text.rfind("\n", 0, m.start()) + 1
+        if start >= size:
+            break
+        end = text.find("\n", start)
+        if end < 0:
+            end = size
+        line_no += text.count("\n", pos, start)
+        pos = start
+        line = text[start:end]
+        if rx.search(line):
+            yield line_no, line
+        search_from = end + 1
+
+
+def compile_page_filter(pattern: str, case_sensitive: bool) -> object | None:
+    hyperscan = load_hyperscan()
+    if hyperscan is None or not pattern.isascii() or HYPERSCAN_UNSAFE_RE.search(pattern):
+        return None
+    flags = (
+        hyperscan.HS_FLAG_SINGLEMATCH
+        | hyperscan.HS_FLAG_MULTILINE
+        | hyperscan.HS_FLAG_UTF8
+        | hyperscan.HS_FLAG_UCP
+    )
+    if not case_sensitive:
+        flags |= hyperscan.HS_FLAG_CASELESS
+    db = hyperscan.Database()
+    try:
+        db.compile(expressions=[pattern.encode("ascii")], flags=[flags])
+    except hyperscan.error:
+        return None
+    return db
+
+
+def page_may_match(db: object, text: str, caseless: bool) -> bool:
+    # re.IGNORECASE folds "i" with U+0130/U+0131; Hyperscan does not.
+    if caseless and ("\u0130" in text or "\u0131" in text):
+        return True
+    hits: list[int] = []
+
+    def on_match(id_: int, start: int, end: int, flags: int, ctx: object) -> None:
+        hits.append(end)
+
+    db.scan(text.encode("utf-8"), match_event_handler=on_match)
+    return bool(hits)
+
+
+def skip_char_class(pattern: str, i: int) -> int:
+    # i points at "["; return the index just past the matching "]".
+    j = i + 1
+    if pattern.startswith("^", j):
+        j += 1
+    if pattern.startswith("]", j):
+        j += 1
+    while j < len(pattern):
+        if pattern[j] == "\\":
+            j += 2
+        elif pattern[j] == "]":
+            return j + 1
+        else:
+            j += 1
+    return j
+
+
+def skip_escape(pattern: str, i: int) -> int:
+    # i points at a backslash followed by a letter or digit; return the index past the
+    # whole escape, including the hex digits, character name or octal digits / group
+    # number it carries. Skipping too far only drops literal characters.
+    kind = pattern[i + 1 : i + 2]
+    j = i + 2
+    if kind in ESCAPE_HEX_DIGITS:
+        return j + ESCAPE_HEX_DIGITS[kind]
+    if kind == "N" and pattern.startswith("{", j):
+        close = pattern.find("}", j)
+        return len(pattern) if close < 0 else close + 1
+    if kind.isdigit():
+        end = min(j + 2, len(pattern))
+        while j < end and pattern[j] in "0123456789":
+            j += 1
+    return j
+
+
+def required_literal(pattern: str) -> tuple[str, bool]:
+    # Longest run of literal characters every match must contain, and whether the
+    # pattern is nothing but that literal. Anything unclear ends the current run,
+    # so the result is always safe to use as a prefilter.
+    if pattern.startswith("(?") and pattern[2:3] in ("a", "i", "L", "m", "s", "u", "x"):
+        return "", False
+
+    runs: list[str] = []
+    run: list[str] = []
+    pure = True
+    depth = 0
+    i = 0
+    n = len(pattern)
+    while i < n:
+        c = pattern[i]
+        if c == "\\":
+            escaped = pattern[i + 1 : i + 2]
+            if not escaped or (escaped.isascii() and escaped.isalnum()):
+                pure = False
+                runs.append("".join(run))
+                run = []
+                i = skip_escape(pattern, i)
+                continue
+            if depth == 0:
+                run.append(escaped)
+            i += 2
+            continue
+        if c == "[":
+            pure = False
+            runs.append("".join(run))
+            run = []
+            i = skip_char_class(pattern, i)
+            continue
+        if c in "()":
+            pure = False
+            runs.append("".join(run))
+            run = []
+            depth += 1 if c == "(" else -1
+            i += 1
+            continue
+        if c == "|":
+            if depth == 0:
+                return "", False
+            i += 1
+            continue
+        if depth > 0:
+            i += 1
+            continue
+        repeat = REPEAT_RE.match(pattern, i) if c == "{" else None
+        if c in "*?+" or repeat is not None:
+            # "*", "?" and "{m,n}" may drop the previous character; "+" keeps it but
+            # the characters either side are no longer adjacent.
+            pure = False
+            if c != "+" and run:
+                run.pop()
+            runs.append("".join(run))
+            run = []
+            i = i + 1 if repeat is None else repeat.end()
+            if i < n and pattern[i] in "?+":
+                i += 1
+            continue
+        if c in ".^${\n":
+            pure = False
+            runs.append("".join(run))
+            run = []
+            i += 1
+            continue
+        run.append(c)
+        i += 1
+    runs.append("".join(run))
+
+    literal = max(runs, key=len)
+    return literal, pure and bool(literal)
+
+
+@dataclass
+class SearchPlan:
+    __slots__ = ("rx", "scan", "page_filter", "caseless", "literal", "literal_only")
+    rx: re.Pattern[str]
+    scan: re.Pattern[str] | None
+    page_filter: object | None
+    caseless: bool
+    literal: str
+    literal_only: bool
+
+
+@functools.lru_cache(maxsize=None)
+def compile_search(pattern: str, case_sensitive: bool) -> SearchPlan:
     flags = 0 if case_sensitive else re.IGNORECASE
+    rx = re.compile(pattern, flags)
+    scan = None if LINE_BOUND_RE.search(pattern) else re.compile(pattern, flags | re.MULTILINE)
+    # Only case-sensitive searches use the literal: folding every page to test a
+    # case-insensitive literal costs more than the regex scan it would skip.
+    literal, literal_only = required_literal(pattern) if case_sensitive else ("", False)
+    return SearchPlan(
+        rx=rx,
+        scan=scan,
+        page_filter=compile_page_filter(pattern, case_sensitive),
+        # Inline flags count too: "--case-sensitive '(?i)i'" still folds U+0130/U+0131.
+        caseless=bool(rx.flags & re.IGNORECASE) or bool(INLINE_IGNORECASE_RE.search(pattern)),
+        literal=literal,
+        literal_only=literal_only,
+    )
+
+
+def search_literal(text: str, literal: str) -> Iterator[tuple[int, str]]:
+    size = len(text)
+    line_no = 1
+    pos = 0
+    found = text.find(literal)
+    while found >= 0:
+        start = text.rfind("\n", 0, found) + 1
+        end = text.find("\n", found)
+        if end < 0:
+            end = size
+        line_no += text.count("\n", pos, start)
+        pos = start
+        yield line_no, text[start:end]
+        found = text.find(literal, end + 1)
+
+
+def search_page(pattern: str, case_sensitive: bool, page: Path) -> list[tuple[int, str]]:
+    plan = compile_search(pattern, case_sensitive)
+    text = read_text(page)
+    if plan.literal and plan.literal not in text:
+        return []
+    if plan.literal_only:
+        return list(search_literal(text, plan.literal))
+    if plan.page_filter is not None and not page_may_match(plan.page_filter, text, plan.caseless):
+        return []
+    return list(search_text(text, plan.rx, plan.scan))
+
+
+def command_search(root: Path, pattern: str, case_sensitive: bool, max_results: int) -> int:
     try:
-        rx = re.compile(pattern, flags)
+        compile_search(pattern, case_sensitive)
     except re.error as exc:
         die(f"invalid regex: {exc}")
 
+    pages = iter_pages(root)
+    search = functools.partial(search_page, pattern, case_sensitive)
+    workers = page_workers(len(pages))
+    if workers < 2:
+        return write_search_hits(root, pages, map(search, pages), max_results)
+
+    # Imported here: concurrent.futures.process is the most expensive import in the
+    # module and only large trees use it.
+    from concurrent.futures import ProcessPoolExecutor
+
+    pool = ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(cache_dir,))
+    try:
+        chunksize = max(1, len(pages) // (workers * 4))
+        hits = pool.map(search, pages, chunksize=chunksize)
+        return write_search_hits(root, pages, hits, max_results)
+    finally:
+        pool.shutdown(cancel_futures=True)
+
+
+def write_search_hits(
+    root: Path,
+    pages: Sequence[Path],
+    results: Iterable[list[tuple[int, str]]],
+    max_results: int,
+) -> int:
     count = 0
-    for page in iter_pages(root):
-        lines = read_lines(page)
+    for page, hits in zip(pages, results):
+        if max_results > 0:
+            hits = hits[: max_results - count]
         rel = relpath(page, root)
-        for i, line in enumerate(lines, start=1):
-            if rx.search(line):
-                write_out(f"{rel}:{i}: {line}")
-                count += 1
-                if max_results > 0 and count >= max_results:
-                    return 0
+        write_lines(f"{rel}:{i}: {line}" for i, line in hits)
+        count += len(hits)
+        if max_results > 0 and count >= max_results:
+            return 0
     return 0
 
 
 def command_toc(root: Path, page: str, max_items: int) -> int:
     target = resolve_page(root, page)
-    lines = read_lines(target)
-    headings = parse_markdown(lines).headings
+    headings = get_parsed(target).headings
 
     if max_items > 0:
         headings = headings[:max_items]
@@ -246,22 +659,10 @@ def match_headings(headings: list[Heading], title: str) -> list[Heading]:
     return [h for h in headings if norm_title in h.text.lower()]
 
 
-def section_bounds(headings: list[Heading], section: Heading, line_count: int) -> tuple[int, int]:
-    start = section.line_index
-    end = line_count
-    for nxt in headings:
-        if nxt.line_index <= section.line_index:
-            continue
-        if nxt.level <= section.level:
-            end = nxt.line_index
-            break
-    return start, end
-
-
 def command_section(root: Path, page: str, title: str, max_lines: int) -> int:
     target = resolve_page(root, page)
-    lines = read_lines(target)
-    parsed = parse_markdown(lines)
+    text, starts = read_doc(target)
+    parsed = get_parsed(target)
     headings = parsed.headings
     hits = match_headings(headings, title)
 
@@ -273,23 +674,18 @@ def command_section(root: Path, page: str, title: str, max_lines: int) -> int:
         die(f"section title is ambiguous. Matches: {options}{tail}")
 
     h = hits[0]
-    start, end = section_bounds(headings, h, len(lines))
+    start, end = section_bounds(h)
 
-    out = lines[start:end]
     if max_lines > 0:
-        out = out[:max_lines]
-    for line in out:
-        write_out(line)
+        end = min(end, start + max_lines)
+    write_text(doc_span(text, starts, start, end))
     return 0
 
 
+@functools.lru_cache(maxsize=512)
 def normalize_lang(lang: str) -> str:
     base = lang.strip().lower()
-    if base in ("py", "python3"):
-        return "python"
-    if base in ("bash", "sh", "zsh", "shell"):
-        return "shell"
-    return base
+    return LANG_ALIASES.get(base, base)
 
 
 def lang_matches(block_lang: str, query_lang: str) -> bool:
@@ -298,33 +694,15 @@ def lang_matches(block_lang: str, query_lang: str) -> bool:
     if not q:
         return True
     if q == "python":
-        return b in ("python", "py", "python3")
+        return b in PYTHON_LANGS
     if q == "shell":
-        return b in ("shell", "bash", "sh", "zsh")
+        return b in SHELL_LANGS
     return b == q
 
 
-def heading_path_for_line(headings: list[Heading], line_index: int) -> str:
-    stack: list[Heading] = []
-    for h in headings:
-        if h.line_index > line_index:
-            break
-        while stack and stack[-1].level >= h.level:
-            stack.pop()
-        stack.append(h)
-    if not stack:
-        return ""
-    return " > ".join(h.text for h in stack)
-
-
-def select_code_blocks(
-    lines: list[str],
-    parsed: ParsedDoc,
-    title: str,
-    lang: str,
-) -> list[CodeBlock]:
+def select_code_blocks(parsed: ParsedDoc, title: str, lang: str) -> list[CodeBlock]:
     start = 0
-    end = len(lines)
+    end = parsed.line_count
 
     if title:
         hits = match_headings(parsed.headings, title)
@@ -334,15 +712,13 @@ def select_code_blocks(
             options = ", ".join(f"'{h.text}'" for h in hits[:8])
             tail = " ..." if len(hits) > 8 else ""
             die(f"section title is ambiguous. Matches: {options}{tail}")
-        start, end = section_bounds(parsed.headings, hits[0], len(lines))
+        start, end = section_bounds(hits[0])
 
-    selected: list[CodeBlock] = []
-    for block in parsed.code_blocks:
-        if block.start_line_index < start or block.start_line_index >= end:
-            continue
-        if lang and not lang_matches(block.lang, lang):
-            continue
-        selected.append(block)
+    lo = bisect_left(parsed.code_block_starts, start)
+    hi = bisect_left(parsed.code_block_starts, end)
+    selected = parsed.code_blocks[lo:hi]
+    if lang:
+        selected = [block for block in selected if lang_matches(block.lang, lang)]
     return selected
 
 
@@ -354,23 +730,44 @@ def code_block_body_bounds(block: CodeBlock) -> tuple[int, int]:
     return start, end
 
 
+def count_page_examples(page: Path) -> dict[str, int]:
+    parsed = get_parsed(page)
+    by_section: dict[str, int] = {}
+    starts = (block.start_line_index for block in parsed.code_blocks)
+    for section in heading_paths(parsed.headings, starts):
+        section = section or "(no heading)"
+        by_section[section] = by_section.get(section, 0) + 1
+    return by_section
+
+
 def command_examples(root: Path, include_all_pages: bool, max_results: int) -> int:
-    pages = iter_pages(root)
+    pages: Sequence[Path] = iter_pages(root)
     if not include_all_pages:
         pages = [p for p in pages if relpath(p, root).startswith("Python_Tutorials/")]
 
-    printed = 0
-    for page in pages:
-        lines = read_lines(page)
-        parsed = parse_markdown(lines)
-        if not parsed.code_blocks:
-            continue
+    workers = page_workers(len(pages))
+    if workers < 2:
+        return write_example_counts(root, pages, map(count_page_examples, pages), max_results)
 
-        by_section: dict[str, int] = {}
-        for block in parsed.code_blocks:
-            section = heading_path_for_line(parsed.headings, block.start_line_index) or "(no heading)"
-            by_section[section] = by_section.get(section, 0) + 1
+    from concurrent.futures import ProcessPoolExecutor
 
+    pool = ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(cache_dir,))
+    try:
+        chunksize = max(1, len(pages) // (workers * 4))
+        counts = pool.map(count_page_examples, pages, chunksize=chunksize)
+        return write_example_counts(root, pages, counts, max_results)
+    finally:
+        pool.shutdown(cancel_futures=True)
+
+
+def write_example_counts(
+    root: Path,
+    pages: Sequence[Path],
+    counts: Iterable[dict[str, int]],
+    max_results: int,
+) -> int:
+    printed = 0
+    for page, by_section in zip(pages, counts):
         rel = relpath(page, root)
         for section, count in by_section.items():
             write_out(f"{rel} | {section} | snippets={count}")
@@ -383,9 +780,8 @@ def command_examples(root: Path, include_all_pages: bool, max_results: int) -> i
 
 def command_snippets(root: Path, page: str, title: str, lang: str, max_results: int) -> int:
     target = resolve_page(root, page)
-    lines = read_lines(target)
-    parsed = parse_markdown(lines)
-    selected = select_code_blocks(lines, parsed, title, lang)
+    parsed = get_parsed(target)
+    selected = select_code_blocks(parsed, title, lang)
 
     if not selected:
         die(f"no code snippets matched in {relpath(target, root)}")
@@ -393,10 +789,12 @@ def command_snippets(root: Path, page: str, title: str, lang: str, max_results:
     if max_results > 0:
         selected = selected[:max_results]
 
+    paths: dict[int, str] = {}
     for i, block in enumerate(selected, start=1):
         body_start, body_end = code_block_body_bounds(block)
         language = block.lang or "text"
-        section = heading_path_for_line(parsed.headings, block.start_line_index) or "(no heading)"
+        section = heading_path_for_line(parsed.table, block.start_line_index, paths)
+        section = section or "(no heading)"
         write_out(
             f"{i:3}: lines {body_start + 1}-{body_end} | lang={language} | section={section}"
         )
@@ -414,9 +812,9 @@ def command_snippet(
     max_lines: int,
 ) -> int:
     target = resolve_page(root, page)
-    lines = read_lines(target)
-    parsed = parse_markdown(lines)
-    selected = select_code_blocks(lines, parsed, title, lang)
+    text, starts = read_doc(target)
+    parsed = get_parsed(target)
+    selected = select_code_blocks(parsed, title, lang)
 
     if not selected:
         die(f"no code snippets matched in {relpath(target, root)}")
@@ -437,17 +835,14 @@ def command_snippet(
         block = selected[index - 1]
 
     body_start, body_end = code_block_body_bounds(block)
-    body = lines[body_start:body_end]
     if max_lines > 0:
-        body = body[:max_lines]
+        body_end = min(body_end, body_start + max_lines)
+    body = doc_span(text, starts, body_start, body_end)
 
-    if not no_fence:
-        lang_tag = block.lang
-        write_out(f"```{lang_tag}" if lang_tag else "```")
-    for line in body:
-        write_out(line)
-    if not no_fence:
-        write_out("```")
+    if no_fence:
+        write_text(body)
+    else:
+        write_text(f"```{block.lang}\n{body}```\n")
     return 0
 
 
@@ -461,27 +856,36 @@ def command_compose(
     max_blocks: int,
 ) -> int:
     target = resolve_page(root, page)
-    lines = read_lines(target)
-    parsed = parse_markdown(lines)
-    selected = select_code_blocks(lines, parsed, title, lang)
+    text, starts = read_doc(target)
+    parsed = get_parsed(target)
+    selected = select_code_blocks(parsed, title, lang)
 
     if not selected:
         die(f"no code snippets matched in {relpath(target, root)}")
     if max_blocks > 0:
         selected = selected[:max_blocks]
 
-    combined: list[str] = []
-    for i, block in enumerate(selected):
+    # Bodies are cut straight out of the page text, joined by a blank line; max_lines
+    # counts those separator lines too.
+    line_count = len(starts) - 1
+    remaining = max_lines
+    parts: list[str] = []
+    for block in selected:
         body_start, body_end = code_block_body_bounds(block)
-        body = lines[body_start:body_end]
-        if not body:
+        body_end = min(body_end, line_count)
+        if body_start >= body_end:
             continue
-        if combined:
-            combined.append("")
-        combined.extend(body)
-
-    if max_lines > 0:
-        combined = combined[:max_lines]
+        if max_lines > 0:
+            if remaining == 0:
+                break
+            if parts:
+                remaining -= 1
+            body_end = min(body_end, body_start + remaining)
+            remaining -= max(0, body_end - body_start)
+        if parts:
+            parts.append("\n")
+        parts.append(doc_span(text, starts, body_start, body_end))
+    combined = "".join(parts)
 
     if not no_fence:
         if lang:
@@ -490,11 +894,8 @@ def command_compose(
             lang_tag = selected[0].lang
         else:
             lang_tag = ""
-        write_out(f"```{lang_tag}" if lang_tag else "```")
-    for line in combined:
-        write_out(line)
-    if not no_fence:
-        write_out("```")
+        combined = f"```{lang_tag}\n{combined}```\n"
+    write_text(combined)
     return 0
 
 
@@ -506,6 +907,11 @@ def build_parser() -> argparse.ArgumentParser:
         default=DEFAULT_DOC_ROOT,
         help=f"Path to docs root (default: {DEFAULT_DOC_ROOT})",
     )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help=f"Do not read or write the parsed-page cache in {DEFAULT_CACHE_DIR}.",
+    )
 
     sub = parser.add_subparsers(dest="cmd", required=True)
 
@@ -655,9 +1061,13 @@ def build_parser() -> argparse.ArgumentParser:
 
 
 def main() -> int:
+    global cache_dir
+
     parser = build_parser()
     args = parser.parse_args()
     root: Path = args.docs_root
+    if args.no_cache:
+        cache_dir = None
 
     if not root.exists() or not root.is_dir():
         die(f"docs root does not exist: {root}")
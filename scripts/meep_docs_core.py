@@ -0,0 +1,236 @@
+"""
+Markdown parsing and heading navigation for meep_docs.py.
+
+Pure, fully annotated code kept apart from the CLI so it can be compiled ahead of
+time with mypyc:
+
+  cd scripts && mypyc meep_docs_core.py
+
+The extension module it writes next to this file is imported in preference to it;
+delete the extension to go back to the interpreted version.
+"""
+
+from __future__ import annotations
+
+import functools
+import re
+import sys
+from array import array
+from bisect import bisect_right
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+
+# Slots come from dataclass(slots=True) where it exists (3.10+): mypyc rejects a
+# class-body __slots__ on dataclasses, and compiled classes have a fixed layout anyway.
+DATACLASS_OPTIONS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(**DATACLASS_OPTIONS)
+class Heading:
+    line_index: int
+    level: int
+    text: str
+    span_lines: int
+    end_line_index: int
+
+
+@dataclass(**DATACLASS_OPTIONS)
+class CodeBlock:
+    start_line_index: int
+    end_line_index: int
+    lang: str
+    closed: bool
+
+
+@dataclass(**DATACLASS_OPTIONS)
+class HeadingTable:
+    # Headings as parallel arrays, for bisect and level scans without per-heading objects.
+    line_index: array[int]
+    level: array[int]
+    text: list[str]
+
+
+@dataclass(**DATACLASS_OPTIONS)
+class ParsedDoc:
+    headings: list[Heading]
+    code_blocks: list[CodeBlock]
+    table: HeadingTable
+    code_block_starts: array[int]
+    line_count: int
+
+
+@functools.lru_cache(maxsize=None)
+def markdown_re() -> re.Pattern[str]:
+    # One scan classifies fence, ATX heading, and setext underline lines; "[^\S\n]" is
+    # whitespace that cannot run past the end of the line. Compiled on first parse so
+    # commands that never parse (list, --help) do not pay for it.
+    return re.compile(
+        r"\n(?=[^\S\n]*[`~]|[#=-])(?:"
+        r"(?P<fence>[^\S\n]*(?P<marker>`{3,}|~{3,})[^\S\n]*(?P<lang>[A-Za-z0-9_+.\-]*).*)"
+        r"|(?P<heading>(?P<hashes>#{1,6})[^\S\n]*(?P<heading_text>.*?)[^\S\n]*#*[^\S\n]*)"
+        r"|(?P<setext>=+|-+)[^\S\n]*"
+        r")$",
+        re.MULTILINE,
+    )
+
+
+def normalize_heading(text: str) -> str:
+    text = text.strip().lstrip("#").strip().rstrip("#")
+    return " ".join(text.split())
+
+
+@functools.lru_cache(maxsize=None)
+def fence_close_re(marker: str) -> re.Pattern[str]:
+    # A fence is closed by a line that starts (after indentation) with at least as
+    # many of the same character as opened it.
+    return re.compile(r"\n[^\S\n]*" + re.escape(marker))
+
+
+def count_lines(text: str) -> int:
+    return text.count("\n") + (1 if text and not text.endswith("\n") else 0)
+
+
+def scan_markdown(
+    text: str,
+) -> tuple[list[tuple[int, int, str, int]], list[tuple[int, int, str, bool]]]:
+    headings: list[tuple[int, int, str, int]] = []
+    code_blocks: list[tuple[int, int, str, bool]] = []
+
+    # A leading newline lets every line (including the first) be matched through
+    # the "\n" literal prefix, so the scan jumps straight between line starts.
+    buf = "\n" + text
+    rx = markdown_re()
+    line_no = -1
+    pos = 0
+    prev_line = -2
+    prev_plain = False
+    m = rx.search(buf)
+    while m is not None:
+        start = m.start()
+        line_no += buf.count("\n", pos, start + 1)
+        pos = start + 1
+        kind = m.lastgroup
+
+        if kind == "fence":
+            # Nothing inside a code block matters until its closing fence, so jump
+            # straight there instead of stopping at every "#" comment or "---" line.
+            fence_start = line_no
+            fence_lang = m.group("lang").strip().lower()
+            close = fence_close_re(m.group("marker")).search(buf, m.end())
+            if close is None:
+                code_blocks.append((fence_start, count_lines(text), fence_lang, False))
+                break
+            start = close.start()
+            line_no += buf.count("\n", pos, start + 1)
+            pos = start + 1
+            code_blocks.append((fence_start, line_no + 1, fence_lang, True))
+            prev_line, prev_plain = line_no, False
+            m = rx.search(buf, close.end())
+            continue
+
+        if kind == "heading":
+            title = normalize_heading(m.group("heading_text"))
+            if title:
+                headings.append((line_no, len(m.group("hashes")), title, 1))
+            prev_line, prev_plain = line_no, False
+        elif line_no > 0 and (prev_line != line_no - 1 or prev_plain):
+            # Setext underline: it turns the previous line into a heading when that
+            # line is non-blank ordinary text (not a fence, heading, or used underline).
+            prev = buf[buf.rfind("\n", 0, start) + 1 : start]
+            if prev.strip():
+                level = 1 if m.group("setext")[0] == "=" else 2
+                title = normalize_heading(prev)
+                if title:
+                    headings.append((line_no - 1, level, title, 2))
+                prev_line, prev_plain = line_no, False
+            else:
+                prev_line, prev_plain = line_no, True
+        else:
+            prev_line, prev_plain = line_no, True
+        m = rx.search(buf, m.end())
+
+    return headings, code_blocks
+
+
+def parse_markdown(text: str) -> ParsedDoc:
+    headings, code_blocks = scan_markdown(text)
+    return build_parsed_doc(headings, code_blocks, count_lines(text))
+
+
+def build_parsed_doc(
+    headings: list[tuple[int, int, str, int]],
+    code_blocks: list[tuple[int, int, str, bool]],
+    line_count: int,
+) -> ParsedDoc:
+    # A section ends at the next heading of the same or a shallower level; walking
+    # right to left with a stack of candidates finds every end in one pass.
+    ends = [line_count] * len(headings)
+    stack: list[tuple[int, int]] = []
+    for i in range(len(headings) - 1, -1, -1):
+        line_index, level = headings[i][0], headings[i][1]
+        while stack and stack[-1][1] > level:
+            stack.pop()
+        if stack:
+            ends[i] = stack[-1][0]
+        stack.append((line_index, level))
+
+    return ParsedDoc(
+        headings=[Heading(*h, end) for h, end in zip(headings, ends)],
+        code_blocks=[CodeBlock(*b) for b in code_blocks],
+        table=HeadingTable(
+            line_index=array("i", [h[0] for h in headings]),
+            level=array("b", [h[1] for h in headings]),
+            text=[h[2] for h in headings],
+        ),
+        code_block_starts=array("i", [b[0] for b in code_blocks]),
+        line_count=line_count,
+    )
+
+
+def section_bounds(section: Heading) -> tuple[int, int]:
+    return section.line_index, section.end_line_index
+
+
+def heading_path_for_line(
+    table: HeadingTable,
+    line_index: int,
+    cache: dict[int, str] | None = None,
+) -> str:
+    # Walk back from the last heading at or before line_index, keeping each heading
+    # that is shallower than everything kept so far: that is its ancestor chain. That
+    # heading alone fixes the chain, so its index keys the optional per-page cache.
+    top = bisect_right(table.line_index, line_index) - 1
+    if cache is not None and top in cache:
+        return cache[top]
+    level = table.level
+    path: list[str] = []
+    min_level = 7
+    for i in range(top, -1, -1):
+        if level[i] < min_level:
+            min_level = level[i]
+            path.append(table.text[i])
+            if min_level == 1:
+                break
+    joined = " > ".join(reversed(path))
+    if cache is not None:
+        cache[top] = joined
+    return joined
+
+
+def heading_paths(headings: list[Heading], line_indices: Iterable[int]) -> Iterator[str]:
+    # One merge-style sweep over headings and ascending line indices; the joined path
+    # is only rebuilt when a heading is crossed.
+    stack: list[Heading] = []
+    path = ""
+    hi = 0
+    count = len(headings)
+    for line_index in line_indices:
+        if hi < count and headings[hi].line_index <= line_index:
+            while hi < count and headings[hi].line_index <= line_index:
+                h = headings[hi]
+                while stack and stack[-1].level >= h.level:
+                    stack.pop()
+                stack.append(h)
+                hi += 1
+            path = " > ".join(h.text for h in stack)
+        yield path
@@ -0,0 +1,118 @@
+import re
+import sys
+from pathlib import Path
+
+import pytest
+
+SCRIPTS = Path(__file__).resolve().parents[1] / "scripts"
+sys.path.insert(0, str(SCRIPTS))
+
+import meep_docs  # noqa: E402
+
+DOC_ROOT = Path(__file__).resolve().parents[1] / "doc" / "docs"
+
+
+@pytest.mark.parametrize(
+    "pattern, text",
+    [
+        (r"\x41mplitude", "Amplitude"),
+        (r"Ampl\x69tude", "Amplitude"),
+        (r"Amplitude", "Amplitude"),
+        (r"\U00000041mplitude", "Amplitude"),
+        (r"\101mplitude", "Amplitude"),
+        (r"\0mplitude", "\0mplitude"),
+        (r"(A)\1mplitude", "AAmplitude"),
+        (r"\N{LATIN CAPITAL LETTER A}mplitude", "Amplitude"),
+        (r"xyz{|Harminv", "Harminv"),
+        (r"a{(?!}b)", "a{c"),
+        (r"{[^a](?!}ab)\d", "{b1"),
+        (r"ab{,3}c", "ac"),
+    ],
+)
+def test_required_literal_skips_escape_arguments(pattern, text):
+    assert re.search(pattern, text)
+    literal, _ = meep_docs.required_literal(pattern)
+    assert literal in text
+
+
+@pytest.mark.parametrize("pattern", [r"\x41mplitude", r"Ampl\x69tude"])
+def test_case_sensitive_search_with_numeric_escape(pattern):
+    hits = [
+        (meep_docs.relpath(page, DOC_ROOT), line_no)
+        for page in meep_docs.iter_pages(DOC_ROOT)
+        for line_no, _ in meep_docs.search_page(pattern, True, page)
+    ]
+    assert hits == [
+        ("Python_Tutorials/Mode_Decomposition.md", 572),
+        ("Scheme_Tutorials/Mode_Decomposition.md", 306),
+    ]
+
+
+@pytest.mark.parametrize("pattern", [r"a[^z]*+(?<=b)", r"a[^z]++(?<=b)", r"(?>a[^z]*)(?<=b)"])
+def test_search_possessive_and_atomic_patterns_match_per_line(tmp_path, pattern):
+    page = tmp_path / "p.md"
+    page.write_text("ab\nc\n", encoding="utf-8")
+    assert meep_docs.search_page(pattern, False, page) == [(1, "ab")]
+
+
+@pytest.mark.parametrize("pattern", ["foo", "(?!zz)foo", r"\Afoo"])
+def test_search_line_numbers_follow_splitlines(tmp_path, pattern):
+    page = tmp_path / "p.md"
+    page.write_text("a\x0cb\nc\x85d\ne\nfoo\n", encoding="utf-8")
+    assert meep_docs.search_page(pattern, False, page) == [(6, "foo")]
+
+
+def test_headings_line_numbers_follow_splitlines(tmp_path, monkeypatch):
+    page = tmp_path / "p.md"
+    page.write_text("intro\x0cmore\u2028still\n# Title\n", encoding="utf-8")
+    monkeypatch.setattr(meep_docs, "cache_dir", None)
+    heading = meep_docs.get_parsed(page).headings[0]
+    assert (heading.line_index, heading.text) == (3, "Title")
+
+
+def test_iter_pages_skips_unreadable_directories(tmp_path, monkeypatch):
+    (tmp_path / "a.md").write_text("# A\n", encoding="utf-8")
+    locked = tmp_path / "locked"
+    locked.mkdir()
+    (locked / "b.md").write_text("# B\n", encoding="utf-8")
+    scandir = meep_docs.os.scandir
+
+    def guarded_scandir(path):
+        if path == str(locked):
+            raise PermissionError(13, "Permission denied", path)
+        return scandir(path)
+
+    monkeypatch.setattr(meep_docs.os, "scandir", guarded_scandir)
+    assert meep_docs.iter_pages.__wrapped__(tmp_path) == (tmp_path / "a.md",)
+
+
+@pytest.mark.parametrize("pattern", [r"(?i)i", r"x(?i:i)", r"(?si)i"])
+def test_case_sensitive_search_with_inline_ignorecase_matches_dotted_i(tmp_path, pattern):
+    page = tmp_path / "p.md"
+    page.write_text("xİ\n", encoding="utf-8")
+    assert meep_docs.compile_search(pattern, True).caseless
+    assert meep_docs.search_page(pattern, True, page) == [(1, "xİ")]
+
+
+def test_read_file_reads_on_after_a_short_read(tmp_path, monkeypatch):
+    page = tmp_path / "p.md"
+    page.write_text("x" * 1000 + "\n", encoding="utf-8")
+    read = meep_docs.os.read
+    monkeypatch.setattr(meep_docs.os, "read", lambda fd, n: read(fd, min(n, 100)))
+    assert meep_docs.read_file(page)[1] == "x" * 1000 + "\n"
+
+
+def test_snippets_uses_the_parse_cache_without_reading_the_page(tmp_path, monkeypatch):
+    page = tmp_path / "p.md"
+    page.write_text("# A\n```py\nx = 1\n```\n", encoding="utf-8")
+    monkeypatch.setattr(meep_docs, "cache_dir", None)
+    meep_docs.get_parsed(page)
+
+    def no_read(path):
+        raise AssertionError(f"read {path}")
+
+    lines: list[str] = []
+    monkeypatch.setattr(meep_docs, "read_text", no_read)
+    monkeypatch.setattr(meep_docs, "write_out", lines.append)
+    assert meep_docs.command_snippets(tmp_path, "p.md", "", "", 0) == 0
+    assert lines == ["  1: lines 3-3 | lang=py | section=A"]